@@ -0,0 +1,98 @@
+"""CuPy (CUDA) clash kernel over 2-bit packed barcodes, for very large sets.
+
+Like numba_kernels.py this lives outside streamlit_app.py so the compiled
+kernel survives Streamlit's script reruns. Importing raises ImportError when
+CuPy or a usable CUDA device is missing, and the app falls back to the CPU.
+"""
+import numpy as np
+import cupy as cp
+
+try:
+    if cp.cuda.runtime.getDeviceCount() == 0:
+        raise ImportError("No CUDA device available")
+except cp.cuda.runtime.CUDARuntimeError as e:
+    raise ImportError(f"No usable CUDA device: {e}") from e
+
+THREADS_PER_AXIS = 16
+INITIAL_CAPACITY = 1 << 20
+# CUDA caps gridDim.x at 2^31 - 1 and gridDim.y at 65535 blocks
+MAX_GRID_X = 2 ** 31 - 1
+MAX_GRID_Y = 65535
+
+# Each thread walks a grid-stride lattice of (i, j) pairs, so sets larger
+# than the grid (e.g. more than 65535 * 16 rows on the y axis) still launch.
+# Clashes are appended at an atomically bumped counter; writes past capacity
+# are dropped and the host reruns with a buffer of the exact size.
+_find_clashes_kernel = cp.RawKernel(r'''
+extern "C" __global__
+void find_clashes(const unsigned long long* codes1, long long n1,
+                  const unsigned long long* codes2, long long n2,
+                  int n_words, int max_distance, int within,
+                  long long* out_i, long long* out_j, int* out_d,
+                  unsigned long long* count, unsigned long long capacity)
+{
+    long long i_step = (long long)gridDim.y * blockDim.y;
+    long long j_step = (long long)gridDim.x * blockDim.x;
+    for (long long i = (long long)blockIdx.y * blockDim.y + threadIdx.y; i < n1; i += i_step) {
+        long long j_start = (long long)blockIdx.x * blockDim.x + threadIdx.x;
+        for (long long j = j_start; j < n2; j += j_step) {
+            if (within && j <= i) {
+                continue;
+            }
+            int d = 0;
+            for (int w = 0; w < n_words && d <= max_distance; ++w) {
+                unsigned long long x = codes1[i * n_words + w] ^ codes2[j * n_words + w];
+                d += __popcll((x | (x >> 1)) & 0x5555555555555555ULL);
+            }
+            if (d <= max_distance) {
+                unsigned long long idx = atomicAdd(count, 1ULL);
+                if (idx < capacity) {
+                    out_i[idx] = i;
+                    out_j[idx] = j;
+                    out_d[idx] = d;
+                }
+            }
+        }
+    }
+}
+''', 'find_clashes')
+
+def launch_geometry(n1, n2):
+    """Block and grid size covering n2 columns by n1 rows, clamped to CUDA's grid limits"""
+    block = (THREADS_PER_AXIS, THREADS_PER_AXIS)
+    grid = (
+        max(1, min(-(-n2 // THREADS_PER_AXIS), MAX_GRID_X)),
+        max(1, min(-(-n1 // THREADS_PER_AXIS), MAX_GRID_Y))
+    )
+    return grid, block
+
+def find_clashes(codes1, codes2, max_distance, within):
+    """Find clashes on the GPU, returning (ii, jj, distances) sorted by (i, j) as NumPy arrays"""
+    n1, n_words = codes1.shape
+    n2 = len(codes2)
+    gpu_codes1 = cp.asarray(np.ascontiguousarray(codes1, dtype=np.uint64))
+    gpu_codes2 = cp.asarray(np.ascontiguousarray(codes2, dtype=np.uint64))
+    grid, block = launch_geometry(n1, n2)
+    
+    capacity = INITIAL_CAPACITY
+    while True:
+        count = cp.zeros(1, dtype=cp.uint64)
+        out_i = cp.empty(capacity, dtype=cp.int64)
+        out_j = cp.empty(capacity, dtype=cp.int64)
+        out_d = cp.empty(capacity, dtype=cp.int32)
+        _find_clashes_kernel(grid, block, (
+            gpu_codes1, np.int64(n1), gpu_codes2, np.int64(n2),
+            np.int32(n_words), np.int32(max_distance), np.int32(within),
+            out_i, out_j, out_d, count, np.uint64(capacity)
+        ))
+        total = int(count.get()[0])
+        if total <= capacity:
+            break
+        capacity = total
+    
+    ii = cp.asnumpy(out_i[:total]).astype(np.intp)
+    jj = cp.asnumpy(out_j[:total]).astype(np.intp)
+    distances = cp.asnumpy(out_d[:total]).astype(np.int64)
+    # Atomic appends arrive in arbitrary order
+    order = np.lexsort((jj, ii))
+    return ii[order], jj[order], distances[order]
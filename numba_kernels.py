@@ -0,0 +1,86 @@
+"""Numba-compiled clash kernels over 2-bit packed barcodes.
+
+Kept out of streamlit_app.py so the compiled functions live in an imported
+module: Streamlit re-executes the app script on every interaction, which
+would otherwise recreate (and recompile) the kernels on each rerun.
+"""
+import numpy as np
+from numba import njit, prange
+
+LOW_BIT_MASK = np.uint64(0x5555555555555555)
+
+@njit(cache=True)
+def popcount(x):
+    """Count set bits in a uint64"""
+    x = x - ((x >> np.uint64(1)) & LOW_BIT_MASK)
+    x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (x * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+@njit(cache=True)
+def pair_distance(codes1, i, codes2, j):
+    """Hamming distance between row i of codes1 and row j of codes2"""
+    d = 0
+    for w in range(codes1.shape[1]):
+        x = codes1[i, w] ^ codes2[j, w]
+        d += popcount((x | (x >> np.uint64(1))) & LOW_BIT_MASK)
+    return d
+
+@njit(parallel=True, cache=True)
+def count_clashes(codes1, codes2, max_distance, within):
+    """Count clashing partners of each row of codes1 (only j > i when within one set)"""
+    counts = np.zeros(len(codes1), dtype=np.int64)
+    for i in prange(len(codes1)):
+        start = i + 1 if within else 0
+        for j in range(start, len(codes2)):
+            if pair_distance(codes1, i, codes2, j) <= max_distance:
+                counts[i] += 1
+    return counts
+
+@njit(parallel=True, cache=True)
+def fill_clashes(codes1, codes2, max_distance, within, offsets, out_i, out_j, out_d):
+    """Write clashing pairs of each row of codes1 starting at its offset"""
+    for i in prange(len(codes1)):
+        idx = offsets[i]
+        start = i + 1 if within else 0
+        for j in range(start, len(codes2)):
+            d = pair_distance(codes1, i, codes2, j)
+            if d <= max_distance:
+                out_i[idx] = i
+                out_j[idx] = j
+                out_d[idx] = d
+                idx += 1
+
+# Barcodes up to 32bp pack into a single word. With 1-D contiguous codes and a
+# branch-free count, LLVM vectorizes the XOR/collapse/popcount inner loop
+# (AVX2, or VPOPCNTQ where the CPU has it) instead of going one pair at a time.
+
+@njit(parallel=True, cache=True)
+def count_clashes_single_word(codes1, codes2, max_distance, within):
+    """Count clashing partners of each single-word code in codes1"""
+    counts = np.zeros(len(codes1), dtype=np.int64)
+    for i in prange(len(codes1)):
+        a = codes1[i]
+        start = i + 1 if within else 0
+        c = 0
+        for j in range(start, len(codes2)):
+            x = a ^ codes2[j]
+            c += popcount((x | (x >> np.uint64(1))) & LOW_BIT_MASK) <= max_distance
+        counts[i] = c
+    return counts
+
+@njit(parallel=True, cache=True)
+def fill_clashes_single_word(codes1, codes2, max_distance, within, offsets, out_i, out_j, out_d):
+    """Write clashing pairs of each single-word code in codes1 starting at its offset"""
+    for i in prange(len(codes1)):
+        a = codes1[i]
+        idx = offsets[i]
+        start = i + 1 if within else 0
+        for j in range(start, len(codes2)):
+            x = a ^ codes2[j]
+            d = popcount((x | (x >> np.uint64(1))) & LOW_BIT_MASK)
+            if d <= max_distance:
+                out_i[idx] = i
+                out_j[idx] = j
+                out_d[idx] = d
+                idx += 1
@@ -1,7 +1,20 @@
 import streamlit as st
 import pandas as pd
-from itertools import combinations
+import numpy as np
 import io
+from collections import Counter
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+try:
+    import numba_kernels
+except ImportError:  # Numba is optional; fall back to the NumPy kernels
+    numba_kernels = None
+
+try:
+    import cuda_kernels
+except ImportError:  # CuPy and a CUDA device are optional
+    cuda_kernels = None
 
 st.set_page_config(page_title="NGS Barcode Clash Checker", layout="wide")
 
@@ -20,58 +33,391 @@ max_mismatch = st.sidebar.number_input(
     help="Barcodes within this Hamming distance are considered clashing"
 )
 
-def hamming_distance(s1, s2):
-    """Calculate Hamming distance between two strings of equal length"""
-    if len(s1) != len(s2):
-        return float('inf')
-    return sum(c1 != c2 for c1, c2 in zip(s1, s2))
+# 2-bit encoding of DNA bases: A=00, C=01, G=10, T=11
+BASE_CODES = np.zeros(256, dtype=np.uint64)
+for _code, _base in enumerate('ACGT'):
+    BASE_CODES[ord(_base)] = _code
+BASES_PER_WORD = 32
+LOW_BIT_MASK = np.uint64(0x5555555555555555)
+# Barcodes up to 8bp (e.g. Illumina i5/i7) fit in 16 bits and are stored as uint16
+SHORT_BARCODE_LENGTH = 8
+
+def pack_barcodes(barcodes):
+    """Pack equal-length DNA barcodes into 2-bit codes, shape (N, ceil(L/32)) of uint64 (uint16 up to 8bp)"""
+    length = len(barcodes[0])
+    n_words = -(-length // BASES_PER_WORD)
+    raw = np.frombuffer(''.join(barcodes).encode('ascii'), dtype=np.uint8)
+    bases = np.zeros((len(barcodes), n_words * BASES_PER_WORD), dtype=np.uint64)
+    bases[:, :length] = BASE_CODES[raw.reshape(len(barcodes), length)]
+    shifts = 2 * np.arange(BASES_PER_WORD, dtype=np.uint64)
+    words = bases.reshape(len(barcodes), n_words, BASES_PER_WORD) << shifts
+    codes = np.bitwise_or.reduce(words, axis=2)
+    if length <= SHORT_BARCODE_LENGTH:
+        return codes.astype(np.uint16)
+    return codes
+
+def swar_popcount(x):
+    """Count set bits in each element of a uint64 array (SWAR fallback for NumPy < 2.0)"""
+    x = x - ((x >> np.uint64(1)) & LOW_BIT_MASK)
+    x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (x * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+# NumPy >= 2.0 dispatches np.bitwise_count to hardware POPCNT/VPOPCNTQ
+popcount = getattr(np, 'bitwise_count', swar_popcount)
+
+# Hamming distance for every 16-bit XOR of two short barcodes (64 KB, fits in L1)
+_xor16 = np.arange(1 << 16, dtype=np.uint64)
+SHORT_DISTANCES = popcount((_xor16 | (_xor16 >> np.uint64(1))) & LOW_BIT_MASK).astype(np.uint8)
+
+def packed_hamming_distance(codes1, codes2):
+    """Calculate Hamming distance between packed barcodes (broadcasts over leading axes)"""
+    x = codes1 ^ codes2
+    if x.dtype == np.uint16:
+        # Short barcodes: a single table lookup replaces collapse + popcount
+        return SHORT_DISTANCES[x[..., 0]]
+    # A base differs if either bit of its 2-bit code differs
+    x = (x | (x >> np.uint64(1))) & LOW_BIT_MASK
+    if x.shape[-1] == 1:
+        return popcount(x[..., 0])
+    return popcount(x).sum(axis=-1, dtype=np.int32)
+
+def group_by_length(barcodes):
+    """Group barcodes by length; barcodes of different lengths never clash"""
+    groups = {}
+    for bc in barcodes:
+        groups.setdefault(len(bc), []).append(bc)
+    return groups
+
+# Pair blocks of BLOCK_SIZE x BLOCK_SIZE keep the distance temporaries cache-sized
+BLOCK_SIZE = 1024
+
+def concat_clash_indices(results):
+    """Concatenate per-block (ii, jj, distances) results"""
+    if not results:
+        empty = np.array([], dtype=np.intp)
+        return empty, empty, np.array([], dtype=np.int64)
+    return tuple(np.concatenate(arrays) for arrays in zip(*results))
+
+# Distances to a few pivot barcodes give a cheap lower bound on pair distances
+N_PIVOTS = 4
+
+def pivot_distances(codes, pivots):
+    """Hamming distance from every packed barcode to each pivot, shape (N, n_pivots)"""
+    return packed_hamming_distance(codes[:, None], pivots[None, :]).astype(np.int16)
+
+def pivot_candidates(p1, p2, max_distance):
+    """Mask of pairs whose pivot lower bound max|d(i,p) - d(j,p)| is within max_distance"""
+    candidates = np.ones((len(p1), len(p2)), dtype=bool)
+    for p in range(p1.shape[1]):
+        candidates &= np.abs(p1[:, p, None] - p2[None, :, p]) <= max_distance
+    return candidates
+
+def block_clashes(codes1, codes2, candidates, max_distance, i0, j0):
+    """Evaluate full distances only for candidate pairs of a block, offset to global indices"""
+    ii, jj = np.nonzero(candidates)
+    distances = packed_hamming_distance(codes1[ii], codes2[jj])
+    keep = distances <= max_distance
+    return ii[keep] + i0, jj[keep] + j0, distances[keep]
+
+def find_clashes_tiled(codes, max_distance):
+    """Find clashes within a set over cache-sized pair blocks, prefiltered by pivot distances"""
+    results = []
+    n = len(codes)
+    pivots = pivot_distances(codes, codes[:N_PIVOTS])
+    for i0 in range(0, n, BLOCK_SIZE):
+        for j0 in range(i0, n, BLOCK_SIZE):
+            block_i = slice(i0, i0 + BLOCK_SIZE)
+            block_j = slice(j0, j0 + BLOCK_SIZE)
+            candidates = pivot_candidates(pivots[block_i], pivots[block_j], max_distance)
+            if i0 == j0:
+                candidates = np.triu(candidates, k=1)
+            results.append(block_clashes(codes[block_i], codes[block_j], candidates, max_distance, i0, j0))
+    return concat_clash_indices(results)
+
+def find_clashes_numba(codes1, codes2, max_distance, within):
+    """Find clashes with the compiled kernels: count per row, then fill preallocated arrays"""
+    if codes1.shape[1] == 1:
+        codes1 = np.ascontiguousarray(codes1[:, 0])
+        codes2 = np.ascontiguousarray(codes2[:, 0])
+        count, fill = numba_kernels.count_clashes_single_word, numba_kernels.fill_clashes_single_word
+    else:
+        count, fill = numba_kernels.count_clashes, numba_kernels.fill_clashes
+    counts = count(codes1, codes2, max_distance, within)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    total = int(counts.sum())
+    out_i = np.empty(total, dtype=np.intp)
+    out_j = np.empty(total, dtype=np.intp)
+    out_d = np.empty(total, dtype=np.int64)
+    fill(codes1, codes2, max_distance, within, offsets, out_i, out_j, out_d)
+    return out_i, out_j, out_d
+
+# Only offload to the GPU when the pair count amortizes transfers and kernel launch
+GPU_MIN_PAIRS = 10 ** 9
+# Below this many pairs NumPy finishes in milliseconds, while a cold Numba
+# specialization takes seconds to compile
+NUMBA_MIN_PAIRS = 10 ** 6
+
+def find_clashes_within(codes, max_distance):
+    """Return index pairs (i < j) and distances of packed barcodes within max_distance"""
+    if cuda_kernels is not None and len(codes) * (len(codes) - 1) // 2 >= GPU_MIN_PAIRS:
+        return cuda_kernels.find_clashes(codes, codes, max_distance, True)
+    if numba_kernels is not None and len(codes) * (len(codes) - 1) // 2 >= NUMBA_MIN_PAIRS:
+        return find_clashes_numba(codes, codes, max_distance, True)
+    return find_clashes_tiled(codes, max_distance)
+
+# Pigeonhole bucketing: barcodes within distance k agree exactly on at least one of
+# k+1 disjoint chunks, so only pairs sharing a (chunk, value) bucket can clash
+BUCKET_MIN_PRUNING = 16
+PAIR_BATCH_SIZE = 1 << 20
+
+def expand_pairs(partners):
+    """Yield batches of (rows, offsets) enumerating offsets 0..partners[q]-1 for every row q"""
+    pair_ends = np.cumsum(partners)
+    q0 = 0
+    while q0 < len(partners):
+        done = pair_ends[q0 - 1] if q0 else 0
+        q1 = max(int(np.searchsorted(pair_ends, done + PAIR_BATCH_SIZE, side='right')), q0 + 1)
+        counts = partners[q0:q1]
+        rows = np.repeat(np.arange(q0, q1), counts)
+        yield rows, np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+        q0 = q1
+
+def bucket_pairs(bucket_ids):
+    """Yield batches of index pairs (i < j) that share a bucket id"""
+    n = len(bucket_ids)
+    order = np.argsort(bucket_ids, kind='stable')
+    sorted_ids = bucket_ids[order]
+    run_starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    run_ends = np.repeat(np.r_[run_starts[1:], n], np.diff(np.r_[run_starts, n]))
+    # Each sorted position pairs with the later members of its run
+    for rows, offsets in expand_pairs(run_ends - np.arange(n) - 1):
+        yield order[rows], order[rows + 1 + offsets]
+
+def matching_pairs(ids1, ids2):
+    """Yield batches of index pairs (i, j) with ids1[i] == ids2[j], via a sorted merge scan"""
+    order = np.argsort(ids2, kind='stable')
+    sorted_ids = ids2[order]
+    lo = np.searchsorted(sorted_ids, ids1, side='left')
+    hi = np.searchsorted(sorted_ids, ids1, side='right')
+    for rows, offsets in expand_pairs(hi - lo):
+        yield rows, order[lo[rows] + offsets]
+
+def chunk_bucket_ids(barcode_sets, max_distance):
+    """Per-chunk bucket ids for each set of equal-length barcodes, numbered consistently across sets"""
+    n_chunks = max_distance + 1
+    length = len(barcode_sets[0][0])
+    chunk_len = length // n_chunks
+    if chunk_len == 0:
+        return None
+    bounds = [p * chunk_len for p in range(n_chunks)] + [length]
+    set_ids = [[] for _ in barcode_sets]
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        buckets = {}
+        for ids, barcodes in zip(set_ids, barcode_sets):
+            ids.append(np.array([buckets.setdefault(bc[a:b], len(buckets)) for bc in barcodes]))
+    return set_ids
+
+def bucket_clashes(pairs, ids1, ids2, p, codes1, codes2, max_distance):
+    """Evaluate candidate pairs from chunk p, skipping pairs that already share an earlier chunk"""
+    results = []
+    for ii, jj in pairs:
+        keep = np.ones(len(ii), dtype=bool)
+        for earlier1, earlier2 in zip(ids1[:p], ids2[:p]):
+            keep &= earlier1[ii] != earlier2[jj]
+        ii, jj = ii[keep], jj[keep]
+        distances = packed_hamming_distance(codes1[ii], codes2[jj])
+        clash = distances <= max_distance
+        results.append((ii[clash], jj[clash], distances[clash]))
+    return results
+
+def find_clashes_bucketed(barcodes, codes, max_distance):
+    """Find clashes within a set via pigeonhole buckets, or None if they would not prune enough"""
+    set_ids = chunk_bucket_ids([barcodes], max_distance)
+    if set_ids is None:
+        return None
+    bucket_ids = set_ids[0]
+    
+    n = len(barcodes)
+    sizes = [np.bincount(ids) for ids in bucket_ids]
+    n_candidates = sum(int((size * (size - 1) // 2).sum()) for size in sizes)
+    if n_candidates * BUCKET_MIN_PRUNING > n * (n - 1) // 2:
+        return None
+    
+    results = []
+    for p, ids in enumerate(bucket_ids):
+        results += bucket_clashes(bucket_pairs(ids), bucket_ids, bucket_ids, p, codes, codes, max_distance)
+    return concat_clash_indices(results)
+
+def find_clashes_between_bucketed(barcodes1, barcodes2, codes1, codes2, max_distance):
+    """Find clashes across two sets by merge-scanning shared chunk buckets, or None if not selective"""
+    set_ids = chunk_bucket_ids([barcodes1, barcodes2], max_distance)
+    if set_ids is None:
+        return None
+    ids1, ids2 = set_ids
+    
+    n_candidates = 0
+    for chunk1, chunk2 in zip(ids1, ids2):
+        n_buckets = max(chunk1.max(), chunk2.max()) + 1
+        n_candidates += int((np.bincount(chunk1, minlength=n_buckets) * np.bincount(chunk2, minlength=n_buckets)).sum())
+    if n_candidates * BUCKET_MIN_PRUNING > len(barcodes1) * len(barcodes2):
+        return None
+    
+    results = []
+    for p, (chunk1, chunk2) in enumerate(zip(ids1, ids2)):
+        results += bucket_clashes(matching_pairs(chunk1, chunk2), ids1, ids2, p, codes1, codes2, max_distance)
+    return concat_clash_indices(results)
+
+def find_clashes_between_tiled(codes1, codes2, max_distance):
+    """Find clashes across two sets over cache-sized pair blocks, prefiltered by pivot distances"""
+    results = []
+    pivots = codes1[:N_PIVOTS]
+    pivots1 = pivot_distances(codes1, pivots)
+    pivots2 = pivot_distances(codes2, pivots)
+    for i0 in range(0, len(codes1), BLOCK_SIZE):
+        for j0 in range(0, len(codes2), BLOCK_SIZE):
+            block_i = slice(i0, i0 + BLOCK_SIZE)
+            block_j = slice(j0, j0 + BLOCK_SIZE)
+            candidates = pivot_candidates(pivots1[block_i], pivots2[block_j], max_distance)
+            results.append(block_clashes(codes1[block_i], codes2[block_j], candidates, max_distance, i0, j0))
+    return concat_clash_indices(results)
+
+def find_clashes_between(codes1, codes2, max_distance):
+    """Return index pairs and distances of packed barcodes across two sets within max_distance"""
+    if cuda_kernels is not None and len(codes1) * len(codes2) >= GPU_MIN_PAIRS:
+        return cuda_kernels.find_clashes(codes1, codes2, max_distance, False)
+    if numba_kernels is not None and len(codes1) * len(codes2) >= NUMBA_MIN_PAIRS:
+        return find_clashes_numba(codes1, codes2, max_distance, False)
+    return find_clashes_between_tiled(codes1, codes2, max_distance)
 
+def build_clash_table(columns, barcodes1, barcodes2, parts):
+    """Build the clash DataFrame once from per-group (i, j, distance) integer arrays"""
+    ii, jj, distances = concat_clash_indices(parts)
+    # Backends emit pairs in different orders; sort by (i, j) so the table is deterministic
+    order = np.lexsort((jj, ii))
+    ii, jj, distances = ii[order], jj[order], distances[order]
+    return pd.DataFrame({
+        columns[0]: np.asarray(barcodes1, dtype=object)[ii],
+        columns[1]: np.asarray(barcodes2, dtype=object)[jj],
+        'Hamming Distance': distances.astype(np.int64)
+    })
+
+def clashes_to_csv(df_clashes):
+    """Serialize a clash table to CSV bytes with Arrow's vectorized writer"""
+    buf = io.BytesIO()
+    pa_csv.write_csv(pa.Table.from_pandas(df_clashes, preserve_index=False), buf)
+    return buf.getvalue()
+
+@st.cache_data(max_entries=16)
 def check_barcodes_within_set(barcodes, max_distance):
     """Check for clashes within a single barcode set"""
-    clashes = []
+    columns = ('Barcode 1', 'Barcode 2')
+    parts = []
+    ordered = []  # Barcodes in group order; clash indices are offset into this list
     barcode_list = list(set(barcodes))  # Remove duplicates
+    if max_distance == 0:
+        # Unique barcodes always differ somewhere, so exact-match clashes are impossible
+        return build_clash_table(columns, ordered, ordered, parts), barcode_list
     
-    for bc1, bc2 in combinations(barcode_list, 2):
-        distance = hamming_distance(bc1, bc2)
-        if distance <= max_distance:
-            clashes.append({
-                'Barcode 1': bc1,
-                'Barcode 2': bc2,
-                'Hamming Distance': distance
-            })
+    for group in group_by_length(barcode_list).values():
+        codes = pack_barcodes(group)
+        clashes = find_clashes_bucketed(group, codes, max_distance)
+        if clashes is None:
+            clashes = find_clashes_within(codes, max_distance)
+        ii, jj, distances = clashes
+        parts.append((ii + len(ordered), jj + len(ordered), distances))
+        ordered.extend(group)
     
-    return clashes, barcode_list
+    return build_clash_table(columns, ordered, ordered, parts), barcode_list
 
+@st.cache_data(max_entries=16)
 def check_barcodes_between_sets(set1, set2, max_distance, set1_name="Set 1", set2_name="Set 2"):
     """Check for clashes between two barcode sets"""
-    clashes = []
+    columns = (f'{set1_name} Barcode', f'{set2_name} Barcode')
+    if max_distance == 0:
+        # Exact matches only: a hash lookup replaces the pairwise comparison
+        set2_counts = Counter(set2)
+        matches = [bc for bc in set1 for _ in range(set2_counts[bc])]
+        indices = np.arange(len(matches))
+        return build_clash_table(columns, matches, matches, [(indices, indices, np.zeros(len(matches), dtype=np.int64))])
     
-    for bc1 in set1:
-        for bc2 in set2:
-            distance = hamming_distance(bc1, bc2)
-            if distance <= max_distance:
-                clashes.append({
-                    f'{set1_name} Barcode': bc1,
-                    f'{set2_name} Barcode': bc2,
-                    'Hamming Distance': distance
-                })
+    parts = []
+    ordered1, ordered2 = [], []
+    set2_groups = group_by_length(set2)
     
-    return clashes
-
-def validate_barcodes(barcodes):
-    """Validate that barcodes are valid DNA sequences"""
-    valid = []
-    invalid = []
+    for length, group1 in group_by_length(set1).items():
+        group2 = set2_groups.get(length)
+        if not group2:
+            continue
+        codes1, codes2 = pack_barcodes(group1), pack_barcodes(group2)
+        clashes = find_clashes_between_bucketed(group1, group2, codes1, codes2, max_distance)
+        if clashes is None:
+            clashes = find_clashes_between(codes1, codes2, max_distance)
+        ii, jj, distances = clashes
+        parts.append((ii + len(ordered1), jj + len(ordered2), distances))
+        ordered1.extend(group1)
+        ordered2.extend(group2)
     
-    for bc in barcodes:
-        bc_clean = bc.strip().upper()
-        if bc_clean and all(c in 'ACGT' for c in bc_clean):
-            valid.append(bc_clean)
-        else:
-            invalid.append(bc)
+    return build_clash_table(columns, ordered1, ordered2, parts)
+
+# Byte lookup table of valid DNA bases
+DNA_BYTES = np.zeros(256, dtype=bool)
+DNA_BYTES[list(b'ACGT')] = True
+
+def dna_mask(cleaned):
+    """Boolean mask of stripped, uppercased barcodes that are non-empty and ACGT only"""
+    lengths = np.fromiter(map(len, cleaned), dtype=np.int64, count=len(cleaned))
+    # Non-ASCII characters become a single '?' byte, so offsets still line up with lengths
+    raw = np.frombuffer(''.join(cleaned).encode('ascii', errors='replace'), dtype=np.uint8)
+    bad_counts = np.concatenate(([0], np.cumsum(~DNA_BYTES[raw])))
+    ends = np.cumsum(lengths)
+    return (lengths > 0) & (bad_counts[ends] == bad_counts[ends - lengths])
+
+def partition_barcodes(cleaned, originals, is_valid):
+    """Split barcodes by a validity mask into (valid cleaned, invalid original) lists"""
+    valid = [bc for bc, ok in zip(cleaned, is_valid) if ok]
+    invalid = [bc for bc, ok in zip(originals, is_valid) if not ok]
     
     return valid, invalid
 
+def validate_barcodes(barcodes):
+    """Validate that barcodes are valid DNA sequences"""
+    cleaned = [bc.strip().upper() for bc in barcodes]
+    return partition_barcodes(cleaned, barcodes, dna_mask(cleaned))
+
+def split_barcode_lines(text):
+    """Uppercase text in one pass and return its stripped, non-empty lines"""
+    return [bc for bc in map(str.strip, text.upper().split('\n')) if bc]
+
+@st.cache_data(max_entries=16)
+def parse_barcodes(raw):
+    """Split raw input (one barcode per line) and validate it, cached on the raw text"""
+    barcodes = split_barcode_lines(raw)
+    return partition_barcodes(barcodes, barcodes, dna_mask(barcodes))
+
+@st.cache_data(max_entries=16)
+def read_uploaded_barcodes(data, filename):
+    """Read and validate barcodes from uploaded TXT/CSV contents, cached on the file bytes"""
+    if filename.endswith('.txt'):
+        barcodes = split_barcode_lines(data.decode('utf-8'))
+        return (barcodes, *partition_barcodes(barcodes, barcodes, dna_mask(barcodes)))
+    # CSV: assume first column contains barcodes; parse only that column, as plain strings
+    try:
+        first_column = pa_csv.open_csv(io.BytesIO(data)).schema.names[0]
+        table = pa_csv.read_csv(
+            io.BytesIO(data),
+            read_options=pa_csv.ReadOptions(use_threads=True),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=[first_column],
+                column_types={first_column: pa.string()}
+            )
+        )
+        barcodes = table.column(0).to_pylist()
+    except pa.ArrowInvalid:
+        # Arrow rejects rows whose field count differs from the header; pandas pads them
+        barcodes = pd.read_csv(io.BytesIO(data)).iloc[:, 0].astype(str).tolist()
+    return (barcodes, *validate_barcodes(barcodes))
+
 # Main interface tabs
 tab1, tab2, tab3 = st.tabs(["Single Set Check", "Multi-Set Comparison", "Upload Files"])
 
@@ -93,24 +439,22 @@ with tab1:
     
     if st.button("Check for Clashes", key="single_set"):
         if barcode_input.strip():
-            barcodes = [bc.strip() for bc in barcode_input.split('\n') if bc.strip()]
-            valid_barcodes, invalid_barcodes = validate_barcodes(barcodes)
+            valid_barcodes, invalid_barcodes = parse_barcodes(barcode_input)
             
             if invalid_barcodes:
                 st.warning(f"⚠️ Invalid barcodes (skipped): {', '.join(invalid_barcodes[:5])}")
             
             if valid_barcodes:
-                clashes, unique_barcodes = check_barcodes_within_set(valid_barcodes, max_mismatch)
+                df_clashes, unique_barcodes = check_barcodes_within_set(valid_barcodes, max_mismatch)
                 
                 st.write(f"**Total unique barcodes:** {len(unique_barcodes)}")
                 
-                if clashes:
-                    st.warning(f"⚠️ Found {len(clashes)} potential clashes:")
-                    df_clashes = pd.DataFrame(clashes)
+                if not df_clashes.empty:
+                    st.warning(f"⚠️ Found {len(df_clashes)} potential clashes:")
                     st.dataframe(df_clashes, use_container_width=True)
                     
                     # Download option
-                    csv = df_clashes.to_csv(index=False)
+                    csv = clashes_to_csv(df_clashes)
                     st.download_button(
                         label="Download clashes as CSV",
                         data=csv,
@@ -150,11 +494,8 @@ with tab2:
         )
     
     if st.button("Compare Sets", key="compare_sets"):
-        set1 = [bc.strip().upper() for bc in set1_input.split('\n') if bc.strip()]
-        set2 = [bc.strip().upper() for bc in set2_input.split('\n') if bc.strip()]
-        
-        set1_valid, set1_invalid = validate_barcodes(set1)
-        set2_valid, set2_invalid = validate_barcodes(set2)
+        set1_valid, set1_invalid = parse_barcodes(set1_input)
+        set2_valid, set2_invalid = parse_barcodes(set2_input)
         
         if set1_invalid:
             st.warning(f"⚠️ Invalid barcodes in Set 1: {', '.join(set1_invalid[:3])}")
@@ -162,17 +503,16 @@ with tab2:
             st.warning(f"⚠️ Invalid barcodes in Set 2: {', '.join(set2_invalid[:3])}")
         
         if set1_valid and set2_valid:
-            clashes = check_barcodes_between_sets(set1_valid, set2_valid, max_mismatch, set1_name, set2_name)
+            df_clashes = check_barcodes_between_sets(set1_valid, set2_valid, max_mismatch, set1_name, set2_name)
             
             st.write(f"**Set 1 unique barcodes:** {len(set(set1_valid))}")
             st.write(f"**Set 2 unique barcodes:** {len(set(set2_valid))}")
             
-            if clashes:
-                st.warning(f"⚠️ Found {len(clashes)} potential clashes between sets:")
-                df_clashes = pd.DataFrame(clashes)
+            if not df_clashes.empty:
+                st.warning(f"⚠️ Found {len(df_clashes)} potential clashes between sets:")
                 st.dataframe(df_clashes, use_container_width=True)
                 
-                csv = df_clashes.to_csv(index=False)
+                csv = clashes_to_csv(df_clashes)
                 st.download_button(
                     label="Download clashes as CSV",
                     data=csv,
@@ -195,14 +535,7 @@ with tab3:
     
     if uploaded_file is not None:
         try:
-            if uploaded_file.name.endswith('.txt'):
-                barcodes = [line.decode('utf-8').strip() for line in uploaded_file if line.strip()]
-            else:  # CSV
-                df = pd.read_csv(uploaded_file)
-                # Assume first column contains barcodes
-                barcodes = df.iloc[:, 0].astype(str).tolist()
-            
-            valid_barcodes, invalid_barcodes = validate_barcodes(barcodes)
+            barcodes, valid_barcodes, invalid_barcodes = read_uploaded_barcodes(uploaded_file.getvalue(), uploaded_file.name)
             
             st.write(f"**Total barcodes read:** {len(barcodes)}")
             st.write(f"**Valid barcodes:** {len(valid_barcodes)}")
@@ -211,16 +544,15 @@ with tab3:
                 st.warning(f"**Invalid barcodes:** {len(invalid_barcodes)}")
             
             if st.button("Analyze Uploaded Barcodes"):
-                clashes, unique_barcodes = check_barcodes_within_set(valid_barcodes, max_mismatch)
+                df_clashes, unique_barcodes = check_barcodes_within_set(valid_barcodes, max_mismatch)
                 
                 st.write(f"**Unique barcodes:** {len(unique_barcodes)}")
                 
-                if clashes:
-                    st.warning(f"⚠️ Found {len(clashes)} potential clashes:")
-                    df_clashes = pd.DataFrame(clashes)
+                if not df_clashes.empty:
+                    st.warning(f"⚠️ Found {len(df_clashes)} potential clashes:")
                     st.dataframe(df_clashes, use_container_width=True)
                     
-                    csv = df_clashes.to_csv(index=False)
+                    csv = clashes_to_csv(df_clashes)
                     st.download_button(
                         label="Download clashes as CSV",
                         data=csv,